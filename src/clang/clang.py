@@ -12,13 +12,765 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import os
 import sys
+import json
+import time
+import atexit
+import threading
 import subprocess
+import shutil
 import shlex
-from jupyter_client import KernelManager
+import textwrap
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from queue import Empty
+from robot.api import logger
 from robot.api.deco import keyword
 
+# Read iopub/shell directly instead of through execute_interactive (fallback for odd kernels)
+_USE_LEGACY_POLL = os.environ.get('CLANG_ROBOT_LEGACY_POLL') == '1'
+# Seconds to wait for the execute_reply once the matching idle status has been seen (legacy path)
+_REPLY_GRACE = 0.25
+# Upper bound on the typeid/typename results remembered per kernel session
+_TYPE_CACHE_SIZE = 1024
+# Windows toolchain discovery results, keyed by environment prefix
+_TOOLCHAINS = {}
+# Seconds vswhere may take to list the Visual Studio installs
+_VSWHERE_TIMEOUT = 30
+# The only iopub message types whose content is read
+_IOPUB_CONSUMED = frozenset(('stream', 'error', 'status'))
+# Path separators as passed in compiler flags
+_TO_POSIX = str.maketrans("\\", "/")
+
+
+def _execute(kc, source, timeout=30, capture=True, silent=False):
+    """
+    Runs ``source`` on the kernel behind ``kc`` and returns its captured stdout.
+
+    With ``capture=False`` stream output is dropped as it arrives and ``""`` is returned.
+    ``silent=True`` is for cells run only for their side effects (startup code, includes,
+    library loads): the kernel publishes nothing for them and errors come with the reply.
+    Cells are never stored in the kernel history, which nothing here reads back.
+    When both apply, the call ends on the ``execute_reply`` alone, without reading iopub.
+    """
+    if _USE_LEGACY_POLL: return _execute_polling(kc, source, timeout, capture, silent)
+    if silent and not capture:
+        # Nothing is read from iopub: no need to wait for the idle status behind the reply
+        _execute_pipelined(kc, (source,), timeout)
+        return ""
+    output, errors = io.StringIO(), io.StringIO()
+    idle = False
+    def on_output(msg):
+        # execute_interactive only hands over messages of this execution
+        nonlocal idle
+        msg_type = msg['header']['msg_type']
+        content = msg['content']
+        if msg_type == 'stream':
+            if capture: output.write(content['text'])
+        elif msg_type == 'error': errors.write("\n".join(content['traceback']))
+        elif msg_type == 'status' and content['execution_state'] == 'idle': idle = True
+    try:
+        reply = kc.execute_interactive(source, silent=silent, store_history=False, timeout=timeout, output_hook=on_output, allow_stdin=False)
+    except TimeoutError:
+        # Once idle, all output is in: a reply that is late or missing does not fail the call
+        if not (idle or errors.tell()):
+            raise TimeoutError(f"C++ execution timed out (no idle status from kernel within {timeout}s).")
+        reply = None
+    # The execute_reply also reports failures that were not published as a traceback
+    if reply and not errors.tell() and reply['content'].get('status') == 'error':
+        errors.write(_reply_error(reply['content']))
+    return _outcome(output, errors)
+
+
+def _execute_polling(kc, source, timeout, capture, silent):
+    """Same as `_execute`, reading the channels directly instead of through ``execute_interactive``."""
+    msg_id = kc.execute(source, silent=silent, store_history=False, allow_stdin=False)
+    output, errors = io.StringIO(), io.StringIO()
+    # One deadline for the whole call: a trickle of unrelated messages cannot extend it
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            msg = kc.get_iopub_msg(timeout=max(0.0, deadline - time.monotonic()))
+        except Empty:
+            if not errors.tell():
+                raise TimeoutError(f"C++ execution timed out (no idle status from kernel within {timeout}s).")
+            break
+        # The iopub channel is shared: skip leftovers of earlier (e.g. timed out) executions
+        if msg.get('parent_header', {}).get('msg_id') != msg_id: continue
+        msg_type = msg['header']['msg_type']
+        content = msg['content']
+        if msg_type == 'stream':
+            if capture: output.write(content['text'])
+        elif msg_type == 'error': errors.write("\n".join(content['traceback']))
+        if msg_type == 'status' and content['execution_state'] == 'idle': break
+    # Kernels send the execute_reply before going idle, so only a short grace period is needed
+    while not errors.tell():
+        try:
+            reply = kc.get_shell_msg(timeout=_REPLY_GRACE)
+        except Empty:
+            break
+        if reply.get('parent_header', {}).get('msg_id') != msg_id: continue
+        if reply['content'].get('status') == 'error':
+            errors.write(_reply_error(reply['content']))
+        break
+    return _outcome(output, errors)
+
+
+def _pipeline(kc, sources, timeout=30):
+    """
+    Runs independent side-effect-only ``sources`` as separate silent cells, all submitted upfront.
+
+    The kernel still runs them one after the other, but the client waits for the replies only
+    once, at the end, instead of one round-trip per cell. Every cell runs even if an earlier one
+    fails. Returns the failures (``TimeoutError`` or ``Exception``) by index in ``sources``.
+    """
+    # stop_on_error=False: the kernel would otherwise abort the cells queued behind a failing one
+    pending = {kc.execute(source, silent=True, store_history=False, allow_stdin=False, stop_on_error=False): i for i, source in enumerate(sources)}
+    failures = {}
+    # Cells run in order: the timeout applies to each of them, not to the whole batch
+    deadline = time.monotonic() + timeout
+    while pending:
+        # Waiting in slices notices a kernel that died (or was stopped at exit) without sitting out the timeout
+        try:
+            reply = kc.get_shell_msg(timeout=max(min(1.0, deadline - time.monotonic()), 0))
+        except Empty:
+            alive = kc.is_alive()
+            if alive and time.monotonic() < deadline: continue
+            error = TimeoutError(f"C++ execution timed out (no reply from kernel within {timeout}s).") if alive else RuntimeError("Kernel died before replying.")
+            for index in pending.values():
+                failures[index] = error
+            break
+        deadline = time.monotonic() + timeout
+        # Leftover replies of earlier (e.g. timed out) executions are skipped
+        index = pending.pop(reply.get('parent_header', {}).get('msg_id'), None)
+        if index is None: continue
+        status = reply['content'].get('status')
+        if status == 'error':
+            failures[index] = Exception(f"C++ Execution Error: {_reply_error(reply['content'])}")
+        elif status == 'aborted':
+            failures[index] = Exception("C++ Execution Error: execution aborted by the kernel.")
+    return failures
+
+
+def _execute_pipelined(kc, sources, timeout=30):
+    """Same as `_pipeline`, raising the first failure in submission order once all replies are in."""
+    failures = _pipeline(kc, sources, timeout)
+    if failures: raise failures[min(failures)]
+
+
+@lru_cache(maxsize=None)
+def _iopub_channel_class():
+    """Returns the iopub channel class of the kernel clients (built on first use: jupyter_client is imported lazily)."""
+    from jupyter_client.channels import ZMQSocketChannel
+
+    class _IOPubChannel(ZMQSocketChannel):
+        """Leaves the content of messages nothing here reads (``execute_input``, ``display_data``...) undecoded."""
+        def _recv(self, **kwargs):
+            _ident, smsg = self.session.feed_identities(self.socket.recv_multipart(**kwargs))
+            # The small header frame alone tells whether the content will be read at all;
+            # the signature is checked either way
+            consumed = len(smsg) < 2 or self.session.unpack(smsg[1]).get('msg_type') in _IOPUB_CONSUMED
+            return self.session.deserialize(smsg, content=consumed)
+
+    return _IOPubChannel
+
+
+def _reply_error(content):
+    """Formats the failure reported by an ``execute_reply`` with status ``error``."""
+    return "\n".join(content.get('traceback') or [f"{content.get('ename', '')}: {content.get('evalue', '')}"])
+
+
+def _outcome(output, errors):
+    """Raises the collected errors, if any, otherwise returns the stripped output."""
+    if errors.tell():
+        raise Exception(f"C++ Execution Error: {errors.getvalue()}")
+    # Declarations produce no output at all: skip building an empty string
+    if not output.tell(): return ""
+    return output.getvalue().strip()
+
+
+def _async_result(bucket):
+    """Returns the ``(output, errors)`` of a finished `Source Exec Async` execution, with the failures only its reply reports."""
+    output, errors, _, reply = bucket
+    status = reply.get('status')
+    if status == 'aborted':
+        errors.write("execution aborted by the kernel.")
+    elif status == 'error' and not errors.tell():
+        errors.write(_reply_error(reply))
+    return output, errors
+
+
+def _is_blank(source):
+    """Tells whether ``source`` holds nothing but whitespace and ``//`` comments."""
+    stripped = source.strip()
+    return not stripped or all(not l.strip() or l.lstrip().startswith("//") for l in stripped.splitlines())
+
+
+@lru_cache(maxsize=64)
+def _kernel_args(includes, link_dirs, toolchain_incs, toolchain_libs, sysroot):
+    """
+    Returns the kernel ``extra_arguments`` for the given paths, as a tuple.
+
+    Memoized: suites usually restart kernels with unchanged settings, which then reuse the same argv.
+    """
+    extra_args = ["-std=c++20"]
+
+    # ALWAYS add user-defined paths from Keywords
+    # This ensures Add Include Path and Add Link Directory work on Linux/OSX/Win
+    extra_args += [f'-I{ip.translate(_TO_POSIX)}' for ip in includes]
+    extra_args += [f'-L{lp.translate(_TO_POSIX)}' for lp in link_dirs]
+
+    if _IS_WIN:
+        extra_args += _WIN_FLAGS
+        extra_args += [f'-I{ip.translate(_TO_POSIX)}' for ip in toolchain_incs]
+        extra_args += [f'-L{lp.translate(_TO_POSIX)}' for lp in toolchain_libs]
+
+    # Universal Sysroot handling
+    # We check for standard environment variables that define the system root.
+    # This is essential for macOS conda-forge, but also applies to any 
+    # cross-compilation scenario on Linux or other platforms.
+    if sysroot:
+        # Only add the flag if it's not already present in combined_flags
+        if not any(arg.startswith(('-isysroot', '--sysroot=')) for arg in extra_args):
+            # Use --sysroot= for maximum compatibility across Clang/GCC
+            # but on Darwin -isysroot is the preferred form for Clang.
+            flag = "-isysroot" if sys.platform == 'darwin' else "--sysroot="
+            extra_args.append(f"{flag}{sysroot}")
+    return tuple(extra_args)
+
+
+def _resolve_include(name, includes, generation):
+    """
+    Resolves header ``name`` against the current directory first, then ``includes``.
+
+    Returns an absolute path for headers found in an include directory, ``name`` otherwise.
+    ``generation`` only takes part in the cache key, so that callers can invalidate it.
+    """
+    # The current directory is checked on every call, and only include directory hits are
+    # cached: a header created after a failed lookup is found by the next one
+    if os.path.exists(name): return name
+    try: return _find_include(name, includes, generation)
+    except FileNotFoundError: return name
+
+
+@lru_cache(maxsize=512)
+def _find_include(name, includes, generation):
+    """Returns the absolute path of ``name`` in the first of ``includes`` holding it, raising ``FileNotFoundError`` (never cached) otherwise."""
+    for p in includes:
+        path = os.path.join(p, name)
+        if os.path.exists(path): return os.path.abspath(path)
+    raise FileNotFoundError(name)
+
+
+def _shutdown(km, kc):
+    """Stops a kernel process and its client channels, polling for effective closure."""
+    if kc:
+        try:
+            # Explicitly stop ZeroMQ channels to release socket locks
+            kc.stop_channels()
+        except Exception: pass
+    if km:
+        try:
+            if km.has_kernel:
+                km.shutdown_kernel(now=True)
+
+            # Polling for effective closure
+            timeout = 5.0
+            start_time = time.time()
+            while km.is_alive() and (time.time() - start_time) < timeout:
+                time.sleep(0.1)
+
+            # Fallback: kill if still alive
+            if km.is_alive():
+                try:
+                    km.interrupt_kernel()
+                    time.sleep(0.2)
+                    if km.is_alive():
+                        km.shutdown_kernel(now=True)
+                except Exception: pass
+
+            km.cleanup_resources()
+        except Exception: pass
+
+
+def _kill(km):
+    """
+    Kills a kernel process from any thread, leaving the cleanup to the thread using ``km``.
+
+    Only the process handle is touched: the kernel manager and its event loop belong to that thread.
+    """
+    process = getattr(km.provisioner, 'process', None)
+    if process:
+        try: process.kill()
+        except OSError: pass
+
+
+# Platform checks and startup preamble are invariant for the process: built once at import
+_IS_WIN = sys.platform == 'win32'
+_STARTUP_TIMEOUT = 120 if _IS_WIN else 60
+# Per startup cell: the common headers, the helpers and the startup libraries
+_HEADER_TIMEOUT = 90 if _IS_WIN else 60
+# Added to the header timeout when the Windows bootstrap shares its cell
+_BOOTSTRAP_TIMEOUT = 60
+
+# Fixed compiler flags for the MSVC runtime on Windows
+_WIN_FLAGS = (
+    "-D_DLL", "-D_MT", "-D_CRT_SECURE_NO_WARNINGS", "-fms-extensions", "-fms-compatibility", "-fms-runtime-lib=dll",
+    "-Xlinker", "/NODEFAULTLIB:libcmt", "-lmsvcprt", "-lmsvcrt", "-lvcruntime", "-lucrt",
+    "-fno-sized-deallocation",
+)
+
+_WIN_BOOTSTRAP = textwrap.dedent(r"""
+        using _robot_size_t = decltype(sizeof(0));
+        extern "C" void* _robot_internal_malloc(_robot_size_t) __asm__("malloc");
+        extern "C" void _robot_internal_free(void*) __asm__("free");
+        extern "C" __declspec(dllimport) void* __stdcall _robot_internal_load_lib(const char*) __asm__("LoadLibraryA");
+        extern "C" __declspec(dllimport) void* __stdcall _robot_internal_module(const char*) __asm__("GetModuleHandleA");
+        extern "C" void* _robot_init_runtimes() {
+            // The kernel usually has the runtimes mapped already: only load the missing ones
+            static const char* const names[] = { "msvcp140.dll", "vcruntime140.dll" };
+            for (const char* name : names) if (!_robot_internal_module(name)) _robot_internal_load_lib(name);
+            return (void*)1;
+        }
+        static void* _dummy_init = _robot_init_runtimes();
+        struct __type_info_node { void* _Mem; struct __type_info_node* _Next; };
+        __declspec(selectany) struct __type_info_node __robot_type_info_root __asm__("?__type_info_root_node@@3U__type_info_node@@A") = { 0, 0 };
+        __declspec(selectany) void* __robot_type_info_vtable [16] __asm__("??_7type_info@@6B@") = { 0 };
+        void operator delete(void* p, _robot_size_t n) noexcept { _robot_internal_free(p); }
+        """)
+
+# Common headers needed by the keywords
+_COMMON_HEADERS = ('#include <iostream>', '#include <string>', '#include <stdexcept>', '#include <vector>', '#include <memory>', '#include <typeinfo>', '#include <cstdlib>', '#include <unordered_map>')
+if not _IS_WIN: _COMMON_HEADERS += ('#include <dlfcn.h>', '#include <cxxabi.h>')
+
+# Helper functions used in some keywords
+if _IS_WIN:
+    _CPP_HELPERS = r"""
+        #include <string>
+        #include <iostream>
+        extern "C" __declspec(dllimport) void* __stdcall _robot_internal_load_lib(const char*) __asm__("LoadLibraryA");
+        void* _robot_load_lib(const char* path) { return _robot_internal_load_lib(path); }
+        std::string _robot_demangle(const char* name) { return std::string(name); }
+        """
+else:
+    _CPP_HELPERS = r"""
+        void* _robot_load_lib(const char* path) {
+            void* h = dlopen(path, RTLD_NOW | RTLD_GLOBAL); 
+            if (!h) { const char* err = dlerror(); throw std::runtime_error("dlopen failed: " + std::string(err ? err : "unknown")); }
+            return h;
+        }
+        std::string _robot_demangle(const char* name) {
+            static std::unordered_map<std::string, std::string> cache;
+            std::string key(name);
+            auto it = cache.find(key); if (it != cache.end()) return it->second;
+            int status = -1;
+            std::unique_ptr<char, void(*)(void*)> res{abi::__cxa_demangle(name, NULL, NULL, &status), std::free};
+            std::string demangled = (status == 0 && res) ? std::string(res.get()) : key;
+            cache.emplace(key, demangled); return demangled;
+        }
+        """
+_CPP_HELPERS += r"""
+        inline void _robot_assert(bool ok, const char* expr, const char* ctx = nullptr) {
+            if (ok) return;
+            std::string m = std::string("AssertionError: ") + expr;
+            if (ctx) { m += " | Context: "; m += ctx; }
+            throw std::runtime_error(m);
+        }
+        // Type queries only JIT the typeid() of the expression
+        inline void _robot_show_type(const std::type_info& t, bool demangle) { std::cout << (demangle ? _robot_demangle(t.name()) : std::string(t.name())); }
+        """
+
+# Headers and helpers go out as a single cell: one kernel round-trip instead of one per line.
+# The helpers are dedented once here, so that the kernel is not sent the source indentation
+_PREAMBLE = "\n".join(_COMMON_HEADERS + (textwrap.dedent(_CPP_HELPERS),))
+
+
+# Control characters go out as 3-digit octal escapes: unlike \x, they cannot swallow a following digit
+_CPP_ESCAPES = str.maketrans({**{chr(c): f'\\{c:03o}' for c in (*range(32), 127)},
+                              '\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+def _cpp_escape(s):
+    """Returns ``s`` escaped for use inside a C++ ``"..."`` literal.
+
+    Non-ASCII characters are left as they are: the kernel reads UTF-8 source, whereas
+    ``\\u`` surrogate escapes (as emitted by ``json.dumps``) are rejected by the compiler.
+    """
+    return str(s).translate(_CPP_ESCAPES)
+
+
+def _load_lib_call(path):
+    """Returns the ``_robot_load_lib`` statement for ``path``, in the separator form the platform loader expects."""
+    # Separators are converted here, once, instead of by the C++ helper at every load
+    path = os.path.normpath(path) if _IS_WIN else path.replace("\\", "/")
+    return f'_robot_load_lib("{_cpp_escape(path)}");'
+
+
+def _prepend_paths(paths, current):
+    """Returns the path list ``current`` with ``paths`` in front of it, without duplicates."""
+    # Ordered sets: duplicates never reach the (size limited) env block
+    return os.pathsep.join(dict.fromkeys(p for p in f"{paths}{os.pathsep}{current}".split(os.pathsep) if p))
+
+
+def _prepend_env(env):
+    """Returns a copy of ``os.environ`` with the paths of each ``(name, paths)`` pair of ``env`` in front of ``name``."""
+    # Read at every launch, so that later changes made by the suite are kept
+    merged = dict(os.environ)
+    for name, paths in env:
+        merged[name] = _prepend_paths(paths, merged.get(name, ''))
+    return merged
+
+
+def _spawn_kernel(kernel_name, extra_args, libraries, env=(), on_start=None):
+    """
+    Launches a kernel and runs the startup preamble (bootstrap, common headers, helpers, libraries).
+
+    ``libraries`` is a sequence of ``(lib_name, target)`` pairs as resolved by `clang._resolve_library`.
+    ``env`` holds ``(name, paths)`` pairs of path list variables: ``paths`` is put in front of
+    the current value of ``name`` in ``os.environ``, in the kernel environment only.
+    ``on_start`` is called with the kernel manager as soon as the kernel process is started.
+    Returns the ready ``(km, kc)`` pair; on failure the kernel is stopped and ``RuntimeError`` is raised.
+    """
+    # Imported on first use: jupyter_client pulls in zmq, tornado and traitlets, which suites
+    # that never start a kernel (dry runs, libdoc) should not pay for
+    from jupyter_client import KernelManager
+    try:
+        km = KernelManager(kernel_name=kernel_name)
+        # Silence kernel process stderr to avoid deadlocks in Robot Framework.
+        # Cell output reaches us over iopub, so the process stdout is not needed either:
+        # detaching it from the console also lets libc fully buffer it instead of
+        # flushing line by line. The trade-off is that raw kernel console output is lost.
+        launch = {'env': _prepend_env(env)} if env else {}
+        km.start_kernel(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, extra_arguments=list(extra_args), **launch)
+    except Exception as e:
+        error_message = f"Failed to start C++ Kernel '{kernel_name}': {e}"
+        raise RuntimeError(error_message)
+    if on_start: on_start(km)
+
+    kc = km.client()
+    kc.iopub_channel_class = _iopub_channel_class()
+    kc.start_channels()
+
+    try: 
+        kc.wait_for_ready(timeout=_STARTUP_TIMEOUT)
+    except RuntimeError:
+        error_message = f"Kernel timed out at startup ({_STARTUP_TIMEOUT}s)."
+        _shutdown(km, kc); raise RuntimeError(error_message)
+
+    # The startup cells are queued back to back and their replies collected at the end: the
+    # kernel moves from one to the next without waiting for the client in between.
+    # All libraries are loaded by one cell as well
+    cells = ["\n".join(_load_lib_call(target) for _, target in libraries)] if libraries else []
+    if _IS_WIN:
+        # The bootstrap travels in the same cell as the preamble. Clang-REPL discards a cell that
+        # fails, so only then are the two retried apart: a bootstrap failure stays a warning
+        failures = _pipeline(kc, [_WIN_BOOTSTRAP + "\n" + _PREAMBLE] + cells, _BOOTSTRAP_TIMEOUT + _HEADER_TIMEOUT)
+        if 0 in failures and not isinstance(failures[0], TimeoutError):
+            failures = _pipeline(kc, [_WIN_BOOTSTRAP, _PREAMBLE] + cells, _HEADER_TIMEOUT)
+            if 0 in failures: print(f"*WARN* Windows bootstrap failed: {failures[0]}")
+            failures = {i - 1: e for i, e in failures.items() if i}
+    else:
+        failures = _pipeline(kc, [_PREAMBLE] + cells, _HEADER_TIMEOUT)
+
+    if 0 in failures:
+        _shutdown(km, kc)
+        raise RuntimeError(f"Failed to load standard headers and helper functions: {failures[0]}")
+    if 1 in failures:
+        # The error message names the path that failed (dlerror), which is mapped back to the
+        # library it was resolved from
+        e = failures[1]
+        _shutdown(km, kc)
+        failed = [lib_name for lib_name, target in libraries if target in str(e)] or [lib_name for lib_name, _ in libraries]
+        raise RuntimeError(f"Failed to load linked library {', '.join(failed)}: {e}")
+
+    return km, kc
+
+
+class _KernelPool:
+    """
+    Keeps spare, fully initialized kernels ready to be handed out by `Start Kernel`.
+
+    Spares are grouped by launch configuration (kernel name, compiler flags and
+    startup libraries), so a kernel is only reused by a `Start Kernel` that would
+    have launched an identical one. Spares are warmed up concurrently on a thread
+    pool and every kernel leaves the pool at most once: user state is never shared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Signalled whenever a warm-up finishes, successfully or not
+        self._ready = threading.Condition(self._lock)
+        # Workers are joined at interpreter exit, so a warm-up is never frozen halfway
+        # through a launch (which would leave an orphan kernel behind).
+        # `close` runs before that join and kills the kernels still starting, see _launching
+        self._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix='clang-kernel-pool')
+        self._idle = {}
+        self._pending = {}
+        self._retiring = []
+        # Kernel managers of the warm-ups in flight, by worker thread
+        self._launching = {}
+        self._closed = False
+
+    def acquire(self, key):
+        """
+        Returns a ready ``(km, kc)`` pair for ``key``, or ``None`` if no live spare is available.
+
+        A spare that is still warming up is waited for, as it is further along than a new launch would be.
+        """
+        dead = []
+        try:
+            with self._ready:
+                while True:
+                    spares = self._idle.get(key)
+                    while spares:
+                        km, kc = spares.popleft()
+                        if km.is_alive():
+                            return km, kc
+                        dead.append((km, kc))
+                    if not self._pending.get(key): return None
+                    self._ready.wait()
+        finally:
+            for km, kc in dead:
+                _shutdown(km, kc)
+
+    def refill(self, key, size):
+        """Starts background warm-up of enough kernels to keep ``size`` spares for ``key``."""
+        with self._lock:
+            if self._closed: return
+            missing = size - len(self._idle.get(key, ())) - self._pending.get(key, 0)
+            if missing <= 0: return
+            self._pending[key] = self._pending.get(key, 0) + missing
+        for _ in range(missing):
+            self._executor.submit(self._warm_up, key)
+
+    def _warm_up(self, key):
+        try:
+            km, kc = _spawn_kernel(*key, on_start=self._started)
+        except Exception:
+            # A failing configuration is reported by the synchronous path of `Start Kernel`
+            km = kc = None
+        with self._lock:
+            self._launching.pop(threading.get_ident(), None)
+            self._pending[key] -= 1
+            self._ready.notify_all()
+            if km and not self._closed:
+                self._idle.setdefault(key, deque()).append((km, kc))
+                return
+        _shutdown(km, kc)
+
+    def _started(self, km):
+        with self._lock:
+            self._launching[threading.get_ident()] = km
+            closed = self._closed
+        # The pool was closed while the process was being created
+        if closed: _kill(km)
+
+    def retire(self, km, kc):
+        """Stops a kernel that is no longer in use without blocking the caller."""
+        worker = threading.Thread(target=_shutdown, args=(km, kc), daemon=True)
+        with self._lock:
+            self._retiring = [t for t in self._retiring if t.is_alive()]
+            self._retiring.append(worker)
+        worker.start()
+
+    def close(self):
+        """
+        Stops all spare kernels and waits for retiring ones. Called at interpreter exit.
+
+        Queued warm-ups are cancelled and the ones in flight are aborted by killing their
+        kernel, so that exit does not wait for kernels that would be stopped right away.
+        """
+        with self._lock:
+            self._closed = True
+            spares = [pair for pool in self._idle.values() for pair in pool]
+            self._idle.clear()
+            retiring = list(self._retiring)
+            launching = list(self._launching.values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for km in launching:
+            _kill(km)
+        for km, kc in spares:
+            _shutdown(km, kc)
+        for worker in retiring:
+            worker.join(timeout=10)
+
+
+_POOL = _KernelPool()
+# concurrent.futures joins the pool workers from a threading atexit hook, which runs before
+# any hook of the atexit module: closed from there, the pool would only be stopped once every
+# warm-up in flight has finished launching a kernel that is then stopped right away.
+# threading._register_atexit is the (private) registration of those hooks, present since
+# CPython 3.9, so with every supported Python. Hooks run in reverse order of registration:
+# this one precedes the join registered when concurrent.futures was imported, above
+if hasattr(threading, '_register_atexit'):
+    threading._register_atexit(_POOL.close)
+else:
+    # Still correct, exit just waits for the warm-ups in flight
+    print("*WARN* threading._register_atexit is not available: exit waits for kernel warm-ups in progress.")
+    atexit.register(_POOL.close)
+
+
+# Result of the last MSVC/SDK discovery, reused until the probed directories change
+_MSVC_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'robotframework-clang', 'msvc.json')
+
+
+def _mtime(path):
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+
+def _newest_subdir(base, required):
+    """Returns the newest (highest named) subdirectory of ``base`` holding ``required``, ``None`` if there is none."""
+    try:
+        with os.scandir(base) as it: names = [e.name for e in it if e.is_dir()]
+    except OSError: return None
+    if not names: return None
+    # The newest one is nearly always complete: only sort when it is not
+    newest = max(names)
+    if os.path.isdir(os.path.join(base, newest, required)): return newest
+    # Newest first, stopping at the first complete one: a half-removed version is skipped
+    for name in sorted(names, reverse=True)[1:]:
+        if os.path.isdir(os.path.join(base, name, required)): return name
+    return None
+
+
+def _msvc_toolset_dirs(toolset):
+    """Returns the existing ``(paths, libs, incs)`` of an MSVC toolset directory (``VC\\Tools\\MSVC\\<version>``)."""
+    dirs = ([os.path.join(toolset, 'bin', 'Hostx64', 'x64')], [os.path.join(toolset, 'lib', 'x64')], [os.path.join(toolset, 'include')])
+    return tuple([d for d in group if os.path.isdir(d)] for group in dirs)
+
+
+def _sdk_dirs(sdk_base, sv):
+    """Returns the existing ``(libs, incs)`` of version ``sv`` of the Windows SDK installed in ``sdk_base``."""
+    inc_base, lib_base = os.path.join(sdk_base, 'Include', sv), os.path.join(sdk_base, 'Lib', sv)
+    # One listing per version directory instead of a stat per component
+    present = _subdir_names(inc_base)
+    incs = [os.path.join(inc_base, sub) for sub in ('ucrt', 'shared', 'um', 'winrt') if sub in present]
+    present = _subdir_names(lib_base)
+    libs = [p for p in (os.path.join(lib_base, sub, 'x64') for sub in ('ucrt', 'um') if sub in present) if os.path.isdir(p)]
+    return libs, incs
+
+
+def _subdir_names(base):
+    """Returns the lowercased names of the subdirectories of ``base`` (empty if it cannot be listed)."""
+    try:
+        with os.scandir(base) as it: return {e.name.lower() for e in it if e.is_dir()}
+    except OSError: return set()
+
+
+def _msvc_from_env():
+    """Returns ``(paths, libs, incs)`` for the toolset selected by a vcvars shell, ``None`` outside of one."""
+    toolset = os.environ.get('VCToolsInstallDir')
+    if not toolset or not os.path.isdir(toolset): return None
+    paths, libs, incs = _msvc_toolset_dirs(toolset)
+    sdk_base, sv = os.environ.get('WindowsSdkDir'), os.environ.get('WindowsSDKVersion', '').strip('\\')
+    if sdk_base and sv:
+        sdk_libs, sdk_incs = _sdk_dirs(sdk_base, sv)
+        libs += sdk_libs; incs += sdk_incs
+    return paths, libs, incs
+
+
+def _vs_install_from_registry():
+    """Returns the Visual Studio install path from its legacy SxS registration, if any."""
+    try: import winreg
+    except ImportError: return None
+    for subkey in (r"SOFTWARE\WOW6432Node\Microsoft\VisualStudio\SxS\VS7", r"SOFTWARE\Microsoft\VisualStudio\SxS\VS7"):
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, subkey) as key:
+                for version in ('17.0', '16.0', '15.0'):
+                    try: return winreg.QueryValueEx(key, version)[0]
+                    except OSError: pass
+        except OSError: pass
+    return None
+
+
+def _discover_msvc():
+    """
+    Locates the latest MSVC toolset and Windows SDK through vswhere (or the registry without it).
+
+    Returns ``(paths, libs, incs, probed)``, where ``probed`` lists the files and directories
+    whose contents decided the result. ``probed`` is ``None`` when the result came from the
+    registry fallback (vswhere missing or failing to run), which no probe covers: such a
+    result must not be cached.
+    """
+    paths, libs, incs = [], [], []
+    # Use vswhere.exe to find MSVC and Windows SDK
+    vswhere = os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'Microsoft Visual Studio', 'Installer', 'vswhere.exe')
+    # The instance registry of the installer changes whenever a Visual Studio instance is
+    # installed, moved or removed, wherever its installation path is
+    instances = os.path.join(os.environ.get('ProgramData', 'C:\\ProgramData'), 'Microsoft', 'VisualStudio', 'Packages', '_Instances')
+    probed = [vswhere, instances]
+    if not os.path.exists(vswhere):
+        # A PATH lookup in process instead of spawning where.exe
+        vswhere = shutil.which('vswhere')
+        if vswhere: probed.append(vswhere)
+
+    install_path = None
+    if vswhere:
+        try:
+            result = subprocess.run([vswhere, '-latest', '-products', '*', '-format', 'json'], capture_output=True, check=True, timeout=_VSWHERE_TIMEOUT, cwd='C:\\')
+            info = json.loads(result.stdout)
+            if info: install_path = info[0]['installationPath']
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            # A hung or broken vswhere must not wedge Start Kernel
+            print(f"*WARN* vswhere failed ({e}): falling back to the registry.")
+            vswhere = None
+    if not vswhere:
+        # vswhere is the only reliable source for side-by-side installs, so this is just a fallback
+        install_path = _vs_install_from_registry()
+        probed = None
+
+    if install_path:
+        tools_path = os.path.join(install_path, 'VC', 'Tools', 'MSVC')
+        if probed is not None: probed += [os.path.dirname(tools_path), tools_path]
+        version = _newest_subdir(tools_path, 'include')
+        if version:
+            paths, libs, incs = _msvc_toolset_dirs(os.path.join(tools_path, version))
+
+        sdk_base = os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'Windows Kits', '10')
+        sdk_inc_base = os.path.join(sdk_base, 'Include')
+        if probed is not None: probed.append(sdk_inc_base)
+        sv = _newest_subdir(sdk_inc_base, 'ucrt')
+        if sv:
+            sdk_libs, sdk_incs = _sdk_dirs(sdk_base, sv)
+            libs += sdk_libs; incs += sdk_incs
+    return paths, libs, incs, probed
+
+
+def _cached_msvc_discovery():
+    """
+    Returns ``(paths, libs, incs)`` from `_discover_msvc`, persisted across runs.
+
+    The cached result is reused as long as the modification times of all the probed
+    directories are unchanged (installing a toolset or SDK version updates them).
+    Setting ``CLANG_ROBOT_MSVC_CACHE`` to ``0`` bypasses the cache in both directions.
+    """
+    use_cache = os.environ.get('CLANG_ROBOT_MSVC_CACHE') != '0'
+    if use_cache:
+        try:
+            with open(_MSVC_CACHE) as f: cached = json.load(f)
+            if all(_mtime(p) == m for p, m in cached['probed']):
+                return cached['paths'], cached['libs'], cached['incs']
+        except (OSError, ValueError, KeyError, TypeError): pass
+
+    paths, libs, incs, probed = _discover_msvc()
+    if probed is None or not use_cache:
+        # Registry fallback results are not covered by any probe: discover again on the next run
+        return paths, libs, incs
+    entry = {'paths': paths, 'libs': libs, 'incs': incs, 'probed': [[p, _mtime(p)] for p in probed]}
+    try:
+        os.makedirs(os.path.dirname(_MSVC_CACHE), exist_ok=True)
+        tmp = f"{_MSVC_CACHE}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f: json.dump(entry, f)
+        # Atomic: concurrent runs never read a half-written cache
+        os.replace(tmp, _MSVC_CACHE)
+    except OSError: pass
+    return paths, libs, incs
+
+
 class clang:
     """
     Robot Framework library for interactive C++ execution using **Clang-REPL** (via xeus-cpp).
@@ -53,18 +805,54 @@ class clang:
     ROBOT_LIBRARY_SCOPE = 'GLOBAL'
     ROBOT_AUTO_KEYWORDS = False
 
-    def __init__(self):
+    def __init__(self, pool_size=0):
         """
         Initializes the library instance. 
         
         Note: This does **not** start the C++ kernel. You must call `Start Kernel` explicitly.
+
+        **Arguments:**
+
+        - ``pool_size``: Number of spare kernels kept warm in the background for each
+          kernel configuration, so that subsequent `Start Kernel` calls do not pay the
+          full startup cost. Each spare is a whole extra kernel process, so pre-warming
+          is off by default (``0``): it pays off in suites that restart the kernel often.
+
+        When the ``CLANG_ROBOT_PREWARM`` environment variable is set to ``1``, warming up
+        starts right away with the default configuration (``xcpp20``, no include paths or
+        libraries), overlapping kernel startup with suite parsing and setup. The first
+        `Start Kernel` with that configuration then waits for the spare instead of
+        launching its own.
+
+        Setting the ``CLANG_ROBOT_LEGACY_POLL`` environment variable to ``1`` makes the
+        library read the kernel channels directly instead of through ``execute_interactive``:
+        a fallback for kernels whose messages that path does not handle.
+
+        **Example:**
+
+        | Library | clang | pool_size=2 |
         """
+        self.pool_size = int(pool_size)
         self.km = None
         self.kc = None
-        self.includes = []
-        self.link_dirs = []
-        self.link_libs = []
+        # Insertion-ordered dicts used as ordered sets: O(1) de-duplication, -I/-L order preserved
+        self.includes = {}
+        self.link_dirs = {}
+        self.link_libs = {}
+        self._include_generation = 0
+        # Snapshot of includes for the include resolver, rebuilt only when the paths change
+        self._frozen_includes = ()
+        self._type_cache = OrderedDict()
+        # Headers already included in the current kernel session
+        self._included = set()
+        # Executions submitted by `Source Exec Async`: msg_id -> [output, errors, idle, reply]
+        self._async = {}
+        # Handles of `Source Parse` calls that did not wait: their errors surface at the next call
+        self._deferred = []
         self._toolchain_initialized = False
+        self._toolchain_env = ()
+        if self.pool_size > 0 and os.environ.get('CLANG_ROBOT_PREWARM') == '1':
+            _POOL.refill(self._launch_config('xcpp20'), self.pool_size)
 
     def init_toolchain(self):
         """
@@ -73,7 +861,15 @@ class clang:
         On other platforms, it currently does nothing as standard paths are usually sufficient.
         """
         if self._toolchain_initialized: return
-        if sys.platform == 'win32': self._setup_windows_toolchain()
+        if _IS_WIN:
+            # Discovery runs vswhere and probes many SDK directories: do it once per environment
+            prefix = os.environ.get('CONDA_PREFIX') or sys.prefix
+            cached = _TOOLCHAINS.get(prefix)
+            if cached:
+                self._toolchain_incs, self._toolchain_libs, self._toolchain_env = cached
+            else:
+                self._setup_windows_toolchain()
+                _TOOLCHAINS[prefix] = (self._toolchain_incs, self._toolchain_libs, self._toolchain_env)
         self._toolchain_initialized = True
 
     def _setup_windows_toolchain(self):
@@ -91,74 +887,36 @@ class clang:
             p_inc = os.path.join(prefix, 'Library', 'include')
             if os.path.exists(p_inc): new_incs.append(p_inc)
 
-        # Heuristic check: if INCLUDE already has MSVC/Windows Kits, we likely don't need discovery
-        env_inc = os.environ.get('INCLUDE', '')
-        if 'MSVC' in env_inc and 'Windows Kits' in env_inc:
-            needs_discovery = False
-        else:
-            needs_discovery = True
-
-        if needs_discovery:
-            try:
-                import json
-                # Use vswhere.exe to find MSVC and Windows SDK
-                vswhere = os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'Microsoft Visual Studio', 'Installer', 'vswhere.exe')
-                if not os.path.exists(vswhere):
-                    try:
-                        v_path = subprocess.check_output(['where', 'vswhere'], shell=False).decode().splitlines()[0].strip()
-                        if os.path.exists(v_path): vswhere = v_path
-                    except: vswhere = None
-                
-                if vswhere and os.path.exists(vswhere):
-                    out = subprocess.check_output([vswhere, '-latest', '-products', '*', '-format', 'json'], shell=False, cwd='C:\\')
-                    info = json.loads(out)
-                    if info:
-                        install_path = info[0]['installationPath']
-                        tools_path = os.path.join(install_path, 'VC', 'Tools', 'MSVC')
-                        if os.path.exists(tools_path):
-                            versions = sorted(os.listdir(tools_path), reverse=True)
-                            if versions:
-                                v = versions[0]
-                                new_incs.append(os.path.join(tools_path, v, 'include'))
-                                new_libs.append(os.path.join(tools_path, v, 'lib', 'x64'))
-                                new_paths.append(os.path.join(tools_path, v, 'bin', 'Hostx64', 'x64'))
-                        
-                        sdk_base = os.path.join(os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'), 'Windows Kits', '10')
-                        sdk_inc_base = os.path.join(sdk_base, 'Include')
-                        if os.path.exists(sdk_inc_base):
-                            sdk_versions = sorted(os.listdir(sdk_inc_base), reverse=True)
-                            if sdk_versions:
-                                sv = sdk_versions[0]
-                                for sub in ['ucrt', 'shared', 'um', 'winrt']:
-                                    p = os.path.join(sdk_inc_base, sv, sub)
-                                    if os.path.exists(p): new_incs.append(p)
-                                for sub in ['ucrt', 'um']:
-                                    p = os.path.join(sdk_base, 'Lib', sv, sub, 'x64')
-                                    if os.path.exists(p): new_libs.append(p)
-            except Exception as e: print(f"*WARN* MSVC discovery failed: {e}")
+        try:
+            # A vcvars shell already names the toolset and SDK: no lookup (nor caching) needed.
+            # Checked first, as such a shell also passes the INCLUDE heuristic below
+            found = _msvc_from_env()
+            # Heuristic check: if INCLUDE already has MSVC/Windows Kits, we likely don't need discovery
+            env_inc = os.environ.get('INCLUDE', '')
+            if not found and not ('MSVC' in env_inc and 'Windows Kits' in env_inc):
+                found = _cached_msvc_discovery()
+            if found:
+                paths, libs, incs = found
+                new_paths.extend(paths); new_libs.extend(libs); new_incs.extend(incs)
+        except Exception as e: print(f"*WARN* MSVC discovery failed: {e}")
             
-        # Update environment variables efficiently
-        def update_env(name, new_list):
-            if not new_list: return
-            current = os.environ.get(name, '').split(os.pathsep)
-            added = [p for p in new_list if p not in current] # Skip expensive exists check if already in env
-            if added:
-                # Re-verify existence only for genuinely new paths
-                valid_added = [p for p in added if os.path.exists(p)]
-                if valid_added:
-                    os.environ[name] = os.pathsep.join(valid_added + [p for p in current if p])
-
-        update_env('PATH', new_paths)
-        update_env('LIB', new_libs)
-        update_env('INCLUDE', new_incs)
-
-        # Jupyter path fix
+        # The toolchain variables are only needed by the kernel process: only the added paths
+        # are kept, and put in front of the then current os.environ values at each launch
+        # (see _prepend_env), instead of mutating os.environ. Every path was checked to exist
+        # when it was discovered: no stat again here
+        overrides = {}
+        for name, new_list in (('PATH', new_paths), ('LIB', new_libs), ('INCLUDE', new_incs)):
+            if new_list: overrides[name] = os.pathsep.join(dict.fromkeys(new_list))
+
+        # Jupyter path fix: kernelspecs are looked up by this process, so this one stays global
         p_paths = [os.path.join(prefix, 'share', 'jupyter'), os.path.join(prefix, 'Library', 'share', 'jupyter'), os.path.join(os.environ.get('ALLUSERSPROFILE', 'C:\\ProgramData'), 'jupyter')]
-        update_env('JUPYTER_PATH', [p for p in p_paths if os.path.exists(p)])
+        p_paths = [p for p in p_paths if os.path.exists(p)]
+        if p_paths: os.environ['JUPYTER_PATH'] = _prepend_paths(os.pathsep.join(p_paths), os.environ.get('JUPYTER_PATH', ''))
         
         # Save only the newly added paths to be passed as flags to the kernel
         self._toolchain_incs = new_incs
         self._toolchain_libs = new_libs
+        self._toolchain_env = tuple(sorted(overrides.items()))
 
     @keyword
     def start_kernel(self, kernel_name='xcpp20'):
@@ -168,6 +926,22 @@ class clang:
         This keyword must be called before executing any C++ code. It initializes the 
         standard library and prepares the environment.
 
+        If a spare kernel with the same configuration was pre-warmed in the background
+        (see the ``pool_size`` library argument), it is handed out immediately instead of
+        launching a new one. A fresh spare is then warmed up for the next call.
+
+        To also skip the startup cost across Robot runs, keep a kernel running with
+        ``robotclang-daemon STATE_FILE`` (accepting ``--kernel``, ``-I``, ``-L`` and ``-l``
+        to match the suite configuration) and point the ``CLANG_ROBOT_CONNECTION_FILE``
+        environment variable at ``STATE_FILE``. `Start Kernel` then attaches to that kernel
+        when the configuration matches, and `Shutdown Kernel` only detaches from it.
+        **Note:** the attached kernel keeps the code run by earlier sessions.
+
+        On Windows, outside of a Visual Studio developer shell, the MSVC toolset and Windows
+        SDK found by ``vswhere`` are cached in ``~/.cache/robotframework-clang/msvc.json``.
+        The cache is refreshed when a Visual Studio instance, toolset or SDK version is added
+        or removed; set ``CLANG_ROBOT_MSVC_CACHE=0`` to bypass it (or delete the file to refresh it).
+
         **Arguments:**
 
         - ``kernel_name``: The name of the Jupyter kernel to use. Defaults to ``xcpp20``. 
@@ -177,135 +951,82 @@ class clang:
 
         | Start Kernel | kernel_name=xcpp17 |
         """
-        if self.km: self._stop_kernel()
-
-        try:
-            self.km = KernelManager(kernel_name=kernel_name)
-            extra_args = ["-std=c++20"]
-            
-            # Keywords need to include the common headers below, so we must inject the env
-
-            # ALWAYS add user-defined paths from Keywords
-            # This ensures Add Include Path and Add Link Directory work on Linux/OSX/Win
-            for ip in self.includes:
-                safe_path = ip.replace("\\", "/")
-                extra_args.append(f'-I{safe_path}')
-            for lp in self.link_dirs:
-                safe_path = lp.replace("\\", "/")
-                extra_args.append(f'-L{safe_path}')
-                            
-            self.init_toolchain()
-            if sys.platform == 'win32':
-                extra_args.extend(["-D_DLL", "-D_MT", "-D_CRT_SECURE_NO_WARNINGS", "-fms-extensions", "-fms-compatibility", "-fms-runtime-lib=dll"])
-                extra_args.extend(["-Xlinker", "/NODEFAULTLIB:libcmt", "-lmsvcprt", "-lmsvcrt", "-lvcruntime", "-lucrt"])
-                extra_args.extend(["-fno-sized-deallocation"])
-                for ip in self._toolchain_incs:
-                    safe_path = ip.replace("\\", "/")
-                    extra_args.append(f'-I{safe_path}')
-                for lp in self._toolchain_libs:
-                    safe_path = lp.replace("\\", "/")
-                    extra_args.append(f'-L{safe_path}')
-            
-            # Universal Sysroot handling
-            # We check for standard environment variables that define the system root.
-            # This is essential for macOS conda-forge, but also applies to any 
-            # cross-compilation scenario on Linux or other platforms.
-            sysroot = os.environ.get('SDKROOT') or os.environ.get('CONDA_BUILD_SYSROOT')
-            
-            if sysroot:
-                # Only add the flag if it's not already present in combined_flags
-                if not any(arg.startswith(('-isysroot', '--sysroot=')) for arg in extra_args):
-                    # Use --sysroot= for maximum compatibility across Clang/GCC
-                    # but on Darwin -isysroot is the preferred form for Clang.
-                    flag = "-isysroot" if sys.platform == 'darwin' else "--sysroot="
-                    extra_args.append(f"{flag}{sysroot}")
-                    
-            # Silence kernel process stderr to avoid deadlocks in Robot Framework
-            self._kernel_process_stderr_pipe = subprocess.DEVNULL
-            self.km.start_kernel(stderr=self._kernel_process_stderr_pipe, extra_arguments=extra_args)
-        except Exception as e:
-            error_message = f"Failed to start C++ Kernel '{kernel_name}': {e}"
-            raise RuntimeError(error_message)
-
-        self.kc = self.km.client()
-        self.kc.start_channels()
-        startup_timeout = 120 if sys.platform == 'win32' else 60
-
-        try: 
-            self.kc.wait_for_ready(timeout=startup_timeout)
-        except RuntimeError:
-            error_message = f"Kernel timed out at startup ({startup_timeout}s)."
-            self._stop_kernel(); raise RuntimeError(error_message)
-
-        if sys.platform == 'win32':
-            bootstrap_cpp = r"""
-            using _robot_size_t = decltype(sizeof(0));
-            extern "C" void* _robot_internal_malloc(_robot_size_t) __asm__("malloc");
-            extern "C" void _robot_internal_free(void*) __asm__("free");
-            extern "C" __declspec(dllimport) void* __stdcall _robot_internal_load_lib(const char*) __asm__("LoadLibraryA");
-            extern "C" void* _robot_init_runtimes() {
-                _robot_internal_load_lib("msvcp140.dll"); _robot_internal_load_lib("vcruntime140.dll"); return (void*)1;
-            }
-            static void* _dummy_init = _robot_init_runtimes();
-            struct __type_info_node { void* _Mem; struct __type_info_node* _Next; };
-            __declspec(selectany) struct __type_info_node __robot_type_info_root __asm__("?__type_info_root_node@@3U__type_info_node@@A") = { 0, 0 };
-            __declspec(selectany) void* __robot_type_info_vtable [16] __asm__("??_7type_info@@6B@") = { 0 };
-            void operator delete(void* p, _robot_size_t n) noexcept { _robot_internal_free(p); }
-            """
-            try: 
-                self.source_exec(bootstrap_cpp, timeout=60)
-            except Exception as e: 
-                print(f"*WARN* Windows bootstrap failed: {e}")
-
-        # Import common headers needed by the keywords
-        common_headers = ['#include <iostream>', '#include <string>', '#include <stdexcept>', '#include <vector>', '#include <memory>', '#include <typeinfo>', '#include <cstdlib>']
-        if sys.platform != 'win32': common_headers.extend(['#include <dlfcn.h>', '#include <cxxabi.h>'])
-        header_timeout = 90 if sys.platform == 'win32' else 60
-
-        for header in common_headers:
-            try: 
-                self.source_exec(header, timeout=header_timeout)
-            except Exception as e: 
-                self._stop_kernel(); raise RuntimeError(f"Failed to load standard header '{header}': {e}")
-
-        # define helper functions used in some keywords
-        if sys.platform == 'win32':
-            cpp_helpers = r"""
-            #include <string>
-            #include <iostream>
-            extern "C" __declspec(dllimport) void* __stdcall _robot_internal_load_lib(const char*) __asm__("LoadLibraryA");
-            void* _robot_load_lib(const char* path) {
-                std::string p = path; for (auto &c : p) if (c == '/') c = '\\';
-                void* h = _robot_internal_load_lib(p.c_str()); return h;
-            }
-            std::string _robot_demangle(const char* name) { return std::string(name); }
-            """
+        if self.kc:
+            # The replacement does not depend on the old kernel being gone: stop it in the background
+            _POOL.retire(self.km, self.kc)
+            self.km = self.kc = None
+            self._type_cache.clear()
+            self._included.clear()
+            self._async.clear()
+            self._deferred.clear()
+
+        # The launch configuration doubles as the pool key: spares are only
+        # reused when they would have been started exactly the same way.
+        key = self._launch_config(kernel_name)
+        attached = self._attach_daemon(key)
+        if attached:
+            # Owned by the daemon: without a manager, stopping only detaches the client
+            self.kc = attached
+            return
+        # Spares come from _spawn_kernel too: either way the handshake is already done
+        pooled = _POOL.acquire(key)
+        if pooled:
+            self.km, self.kc = pooled
         else:
-            cpp_helpers = r"""
-            void* _robot_load_lib(const char* path) {
-                void* h = dlopen(path, RTLD_NOW | RTLD_GLOBAL); 
-                if (!h) { const char* err = dlerror(); throw std::runtime_error("dlopen failed: " + std::string(err ? err : "unknown")); }
-                return h;
-            }
-            std::string _robot_demangle(const char* name) {
-                int status = -1; char* res = abi::__cxa_demangle(name, NULL, NULL, &status);
-                if (status == 0 && res != NULL) { std::string demangled(res); std::free(res); return demangled; }
-                return std::string(name);
-            }
-            """
-        try: 
-            self.source_exec(cpp_helpers, timeout=60)
-        except Exception as e: 
-            self._stop_kernel()
-            raise RuntimeError(f"Failed to inject helper functions: {e}")
-        
-        for lib_name in self.link_libs: 
-            self._safe_load_library(lib_name)
+            self.km, self.kc = _spawn_kernel(*key)
+        if self.pool_size > 0:
+            _POOL.refill(key, self.pool_size)
+
+    def _attach_daemon(self, key):
+        """Returns a client of the kernel published by ``robotclang-daemon``, ``None`` if it cannot be used."""
+        state_file = os.environ.get('CLANG_ROBOT_CONNECTION_FILE')
+        if not state_file: return None
+        try:
+            with open(state_file) as f: state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # JSON turns the tuples of the launch configuration into lists
+        if json.loads(json.dumps(key)) != state.get('config'):
+            print("*WARN* The kernel daemon runs another configuration: starting a new kernel.")
+            return None
+        from jupyter_client import BlockingKernelClient
+        kc = BlockingKernelClient(connection_file=state['connection_file'], iopub_channel_class=_iopub_channel_class())
+        try:
+            kc.load_connection_file()
+            kc.start_channels()
+            kc.wait_for_ready(timeout=10)
+        except (OSError, ValueError, RuntimeError) as e:
+            _shutdown(None, kc)
+            print(f"*WARN* The kernel daemon does not answer ({e}): starting a new kernel.")
+            return None
+        return kc
+
+    def _launch_config(self, kernel_name):
+        """Returns the ``(kernel_name, extra_args, libraries, env)`` launch configuration of the current settings."""
+        self.init_toolchain()
+        sysroot = os.environ.get('SDKROOT') or os.environ.get('CONDA_BUILD_SYSROOT')
+        toolchain = (tuple(self._toolchain_incs), tuple(self._toolchain_libs)) if _IS_WIN else ((), ())
+        extra_args = _kernel_args(self._frozen_includes, tuple(self.link_dirs), *toolchain, sysroot)
+
+        # One listing per link directory instead of a stat per (library, candidate, directory)
+        listings = {}
+        if self.link_libs:
+            for d in self.link_dirs:
+                try: listings[d] = frozenset(os.path.normcase(n) for n in os.listdir(d))
+                except OSError: pass
+        libraries = tuple((lib_name, self._resolve_library(lib_name, listings)) for lib_name in self.link_libs)
+        return (kernel_name, extra_args, libraries, self._toolchain_env)
+
+    def _resolve_library(self, lib_name, listings):
+        """
+        Returns the path (or bare name) that ``_robot_load_lib`` should open for ``lib_name``.
 
-    def _safe_load_library(self, lib_name):
+        ``listings`` maps link directories to their (normcased) entries; names with a directory
+        part cannot be looked up there and are checked on the filesystem instead.
+        """
         resolved_path = None
         candidates = []
-        if sys.platform == 'win32':
+        if _IS_WIN:
             if not lib_name.lower().endswith('.dll'): 
                 candidates.append(f"{lib_name}.dll")
             candidates.extend([lib_name, f"lib{lib_name}.dll"])
@@ -317,51 +1038,25 @@ class clang:
         for cand in candidates:
             for d in self.link_dirs:
                 path = os.path.join(d, cand)
-                if os.path.exists(path): 
+                if os.path.dirname(cand): found = os.path.exists(path)
+                else: found = os.path.normcase(cand) in listings.get(d, ())
+                if found: 
                     resolved_path = os.path.abspath(path)
                     break
             if resolved_path: 
                 break
         target = resolved_path if resolved_path else candidates[0]
-        target_f = target.replace("\\", "/")
-        try: 
-            self.source_exec(f'_robot_load_lib("{target_f}");', timeout=60)
-        except Exception as e: 
-            self._stop_kernel()
-            raise RuntimeError(f"Failed to load linked library {lib_name}: {e}")
+        return target.replace("\\", "/")
                      
     def _stop_kernel(self):
         """Internal helper to stop the kernel process with polling for effective closure."""
-        if self.kc:
-            try:
-                # Explicitly stop ZeroMQ channels to release socket locks
-                self.kc.stop_channels()
-            except: pass
-            self.kc = None
-        if self.km:
-            try:
-                if self.km.has_kernel:
-                    self.km.shutdown_kernel(now=True)
-                
-                # Polling for effective closure
-                import time
-                timeout = 5.0
-                start_time = time.time()
-                while self.km.is_alive() and (time.time() - start_time) < timeout:
-                    time.sleep(0.1)
-                
-                # Fallback: kill if still alive
-                if self.km.is_alive():
-                    try:
-                        self.km.interrupt_kernel()
-                        time.sleep(0.2)
-                        if self.km.is_alive():
-                            self.km.shutdown_kernel(now=True)
-                    except: pass
-                
-                self.km.cleanup_resources()
-            except: pass
-            self.km = None
+        _shutdown(self.km, self.kc)
+        self.kc = None
+        self.km = None
+        self._type_cache.clear()
+        self._included.clear()
+        self._async.clear()
+        self._deferred.clear()
 
     @keyword
     def shutdown_kernel(self):
@@ -369,11 +1064,17 @@ class clang:
         Stops the running C++ kernel and cleans up resources.
 
         This also clears the accumulated include paths and link settings.
+
+        Pre-warmed spares are kept, so the next `Start Kernel` with the same configuration
+        (e.g. in the following suite) is still served immediately. The stopped kernel itself
+        is never put back into the pool: the code it ran would leak into the next session.
         """
         self._stop_kernel()
-        self.includes = []
-        self.link_dirs = []
-        self.link_libs = []
+        self.includes = {}
+        self.link_dirs = {}
+        self.link_libs = {}
+        self._frozen_includes = ()
+        self._include_generation += 1
 
     @keyword
     def add_include_path(self, *paths):
@@ -394,9 +1095,9 @@ class clang:
         | Add Include Path | /opt/mylib/include | ${CURDIR}/../include |
         """
         for p in paths:
-            abs_p = os.path.abspath(p)
-            if abs_p not in self.includes:
-                self.includes.append(abs_p)
+            self.includes.setdefault(os.path.abspath(p), None)
+        self._frozen_includes = tuple(self.includes)
+        self._include_generation += 1
 
     @keyword
     def add_link_directory(self, *paths):
@@ -410,9 +1111,7 @@ class clang:
         - ``paths``: One or more directory paths to add.
         """
         for p in paths:
-            abs_p = os.path.abspath(p)
-            if abs_p not in self.link_dirs:
-                self.link_dirs.append(abs_p)
+            self.link_dirs.setdefault(os.path.abspath(p), None)
 
     @keyword
     def link_libraries(self, *libs):
@@ -426,11 +1125,10 @@ class clang:
         - ``libs``: Names of libraries (e.g., ``m`` for libm, ``pthread``).
         """
         for l in libs:
-            if l not in self.link_libs:
-                self.link_libs.append(l)
+            self.link_libs.setdefault(l, None)
 
     @keyword
-    def source_include(self, *files):
+    def source_include(self, *files, force=False):
         """
         Includes header files in the current session.
 
@@ -438,30 +1136,118 @@ class clang:
         found in the current directory, it searches through the paths added via
         `Add Include Path` and uses an absolute path if a match is found.
 
+        Headers already included in the current kernel session are skipped, saving
+        the parse of the whole header again.
+
         **Arguments:**
 
         - ``files``: Names of the header files to include (e.g., ``vector``, ``myheader.h``).
+        - ``force``: Include the headers even if they were already included, e.g. for
+          headers without include guards that are meant to be expanded more than once.
 
         **Example:**
 
         | Source Include | vector | map |
         """
+        lines, targets = [], []
         for f in files:
-            self.source_exec(f'#include "{f}"')
+            target = _resolve_include(f, self._frozen_includes, self._include_generation)
+            if target != f: logger.info(f"Resolved {f} to {target}")
+            target = target.replace("\\", "/")
+            # A header-name has no escape sequences: reject what cannot be spelled instead of
+            # sending the kernel code that is bound to fail compiling
+            if '"' in target or '\n' in target:
+                raise RuntimeError(f"Invalid header name for #include: {f!r}")
+            if not force and (target in self._included or target in targets): continue
+            targets.append(target)
+            lines.append(f'#include "{target}"')
+        # All headers go out as a single cell
+        if lines: self._exec_silent("\n".join(lines))
+        self._included.update(targets)
 
     @keyword
-    def source_parse(self, *parts):
+    def source_parse(self, *parts, wait=True):
         """
         Defines C++ code structure (declarations) without expecting output. 
         
         Useful for defining classes, functions, or globals.
-        Alias for `Source Exec`.
+        Works like `Source Exec`, but any output is discarded instead of being collected.
 
         **Arguments:**
 
         - ``parts``: Lines of C++ code.
+        - ``wait``: Wait for the code to be compiled. With ``False`` the keyword returns right
+          after submitting it, and a compile error fails the next keyword using the kernel instead.
+
+        **Example:**
+
+        | Source Parse | struct Point { int x; int y; }; | wait=False |
         """
-        self.source_exec("\n".join(parts))
+        source = "\n".join(parts)
+        if not self.kc:
+            raise RuntimeError("Kernel client not initialized. Did you call 'Start Kernel'?")
+        if _is_blank(source): return
+        if not wait:
+            # Not silent: the error must be published on iopub, where pending executions are read
+            self._deferred.append(self.source_exec_async(source))
+            return
+        self._exec_silent(source)
+
+    def _exec_silent(self, source, timeout=30):
+        """Runs ``source`` for its side effects only: nothing is published or collected."""
+        _execute(self._client(timeout), source, timeout, capture=False, silent=True)
+
+    def _client(self, timeout=30):
+        """
+        Returns the kernel client, once the output of code pending from `Source Exec Async` is collected.
+
+        Raises the errors of `Source Parse` calls that did not wait for their code.
+        """
+        if not self.kc:
+            raise RuntimeError("Kernel client not initialized. Did you call 'Start Kernel'?")
+        # The kernel runs cells in order: the last submission is done once all of them are.
+        # Synchronous calls skip the messages of other executions, so these must be read first
+        if self._async:
+            self._collect_async(next(reversed(self._async)), timeout)
+        if self._deferred:
+            deferred, self._deferred = self._deferred, []
+            # The replies count too: a declaration may fail without publishing a traceback
+            errors = [e.getvalue() for _, e in (_async_result(self._async.pop(h)) for h in deferred) if e.tell()]
+            if errors:
+                errors = "\n".join(errors)
+                raise Exception(f"C++ Execution Error (in an earlier Source Parse): {errors}")
+        return self.kc
+
+    def _collect_async(self, handle, timeout):
+        """
+        Reads shell and iopub into the buckets of the pending executions until ``handle`` is done.
+
+        An execution is done once both its reply and its idle status are in. The replies are
+        read first: the kernel publishes nothing for an execution it aborted.
+        """
+        deadline = time.monotonic() + timeout
+        target = self._async[handle]
+        while target[3] is None:
+            try:
+                reply = self.kc.get_shell_msg(timeout=max(0.0, deadline - time.monotonic()))
+            except Empty:
+                raise TimeoutError(f"C++ execution timed out (no reply from kernel within {timeout}s).")
+            bucket = self._async.get(reply.get('parent_header', {}).get('msg_id'))
+            if bucket is None: continue
+            bucket[3] = reply['content']
+            if bucket[3].get('status') == 'aborted': bucket[2] = True
+        while not target[2]:
+            try:
+                msg = self.kc.get_iopub_msg(timeout=max(0.0, deadline - time.monotonic()))
+            except Empty:
+                raise TimeoutError(f"C++ execution timed out (no idle status from kernel within {timeout}s).")
+            bucket = self._async.get(msg.get('parent_header', {}).get('msg_id'))
+            if bucket is None: continue
+            msg_type = msg['header']['msg_type']
+            content = msg['content']
+            if msg_type == 'stream': bucket[0].write(content['text'])
+            elif msg_type == 'error': bucket[1].write("\n".join(content['traceback']))
+            elif msg_type == 'status' and content['execution_state'] == 'idle': bucket[2] = True
 
     @keyword
     def source_file(self, path):
@@ -503,25 +1289,57 @@ class clang:
         | ${out}= | Source Exec | std::cout << "Hello"; |
         """
         source = "\n".join(parts)
+        kc = self._client(timeout)
+        if _is_blank(source): return ""
+        return _execute(kc, source, timeout)
+
+    @keyword
+    def source_exec_async(self, *parts):
+        """
+        Submits C++ code for execution and returns at once, without waiting for it to complete.
+
+        The kernel runs submitted code in order. Pass the returned handle to `Source Exec Wait`
+        to get the output. Other keywords may be used in the meantime: they first collect the
+        output of all pending code. A failure only fails the wait for its own handle: the code
+        submitted after it still runs.
+
+        **Arguments:**
+
+        - ``parts``: One or more strings constituting the C++ code to run.
+
+        **Returns:**
+
+        - A handle identifying the execution.
+
+        **Example:**
+
+        | ${handle}= | Source Exec Async | std::cout << 6 * 7; |
+        | ${out}= | Source Exec Wait | ${handle} |
+        """
         if not self.kc:
             raise RuntimeError("Kernel client not initialized. Did you call 'Start Kernel'?")
-        msg_id = self.kc.execute(source)
-        output, errors = [], []
-        while True:
-            try:
-                msg = self.kc.get_iopub_msg(timeout=timeout)
-                msg_type = msg['header']['msg_type']
-                content = msg['content']
-                if msg_type == 'stream': output.append(content['text'])
-                elif msg_type == 'error': errors.append("\n".join(content['traceback']))
-                if msg_type == 'status' and content['execution_state'] == 'idle': break
-            except:
-                if not errors:
-                    raise TimeoutError(f"C++ execution timed out (no response from kernel for {timeout}s).")
-                break
-        if errors:
-            raise Exception(f"C++ Execution Error: {''.join(errors)}")
-        return "".join(output).strip()
+        # Without stop_on_error=False, a failure would make the kernel abort the code queued behind it
+        handle = self.kc.execute("\n".join(parts), store_history=False, allow_stdin=False, stop_on_error=False)
+        # Output, errors, idle status seen, reply content
+        self._async[handle] = [io.StringIO(), io.StringIO(), False, None]
+        return handle
+
+    @keyword
+    def source_exec_wait(self, handle, timeout=30):
+        """
+        Waits for code submitted with `Source Exec Async` and returns its standard output.
+
+        Fails like `Source Exec` if the code throws an exception or fails to compile.
+
+        **Arguments:**
+
+        - ``handle``: The handle returned by `Source Exec Async`.
+        - ``timeout``: Maximum time (seconds) to wait for the code to complete. Default 30s.
+        """
+        if handle not in self._async:
+            raise RuntimeError(f"Unknown or already collected execution handle: {handle}")
+        self._collect_async(handle, float(timeout))
+        return _outcome(*_async_result(self._async.pop(handle)))
 
     @keyword
     def load_shared_library(self, *libraries):
@@ -539,9 +1357,8 @@ class clang:
 
         | Load Shared Library | /usr/lib/libm.so |
         """
-        for lib in libraries:
-            lib_f = lib.replace("\\", "/")
-            self.source_exec(f'_robot_load_lib("{lib_f}");', timeout=60)
+        # One cell per library, so that a failing load does not discard the others
+        _execute_pipelined(self._client(60), [_load_lib_call(lib) for lib in libraries], timeout=60)
 
     @keyword
     def assert_(self, cond, otherwise=None):
@@ -551,7 +1368,7 @@ class clang:
         **Arguments:**
 
         - ``cond``: A string containing a C++ expression that evaluates to ``bool``.
-        - ``otherwise``: Optional message or value to include in the error if the assertion fails.
+        - ``otherwise``: Optional message to include in the error if the assertion fails.
 
         **Example:**
 
@@ -559,12 +1376,12 @@ class clang:
         | Assert | x > 0 | Context: x should be positive |
         | Assert | x == 5 |
         """
-        context_code = f' << " | Context: " << ({otherwise})' if otherwise else ''
-        check_code = f"""
-        if (!({cond})) {{
-            throw std::runtime_error("AssertionError: {cond}" {context_code});
-        }}
-        """
+        # The check is a call to the precompiled _robot_assert helper: only the call site gets JIT-compiled
+        # Non-string contexts (e.g. ${42}) are passed as their text too
+        ctx = f'"{_cpp_escape(otherwise)}"' if otherwise not in (None, '') else 'nullptr'
+        # static_cast keeps the contextual conversion of if (...): types with an explicit
+        # operator bool (smart pointers, std::optional) do not convert implicitly
+        check_code = f'_robot_assert(static_cast<bool>({cond}), "{_cpp_escape(cond)}", {ctx});'
         try:
             self.source_exec(check_code, timeout=60)
         except Exception as e:
@@ -587,8 +1404,37 @@ class clang:
         | ${val}= | Get Value | x * 2 |
         | Should Be Equal | ${val} | 200 |
         """
+        # Printed at the call site, not by a helper template: operator<< must be looked up
+        # where user code can see it (e.g. a global one declared later for a std type)
         return self.source_exec(f"std::cout << ({obj_expression});", timeout=60)
 
+    @keyword
+    def get_values(self, *expressions):
+        """
+        Retrieves the string representations of several C++ expressions at once.
+
+        All expressions are evaluated in a single cell, so the batch costs one round-trip
+        instead of one `Get Value` per expression. Each result is stripped like with `Get Value`.
+
+        **Arguments:**
+
+        - ``expressions``: The expressions to evaluate, in order.
+
+        **Returns:**
+
+        - The list of results, one per expression.
+
+        **Example:**
+
+        | Source Exec | int x = 100; |
+        | ${vals}= | Get Values | x * 2 | x + 1 |
+        | Should Be Equal | ${vals} | ${{['200', '101']}} |
+        """
+        if not expressions: return []
+        # A terminator that str.strip() leaves alone (unlike \x1c-\x1f) keeps empty results in place
+        out = self.source_exec("\n".join(f"std::cout << ({e}) << '\\x03';" for e in expressions), timeout=60)
+        return [v.strip() for v in out.split("\x03")[:len(expressions)]]
+
     @keyword
     def call_function(self, func, *params):
         """
@@ -604,22 +1450,56 @@ class clang:
         | Source Exec | int add(int a, int b) {{ return a + b; }} |
         | ${res}= | Call Function | add | 2 | 3 |
         """
-        params_str = ", ".join(map(str, params))
-        return self.source_exec(f"std::cout << {func}({params_str});", timeout=60)
+        # Robot passes arguments as strings already: only convert the others
+        params_str = ", ".join(p if type(p) is str else str(p) for p in params)
+        return self.source_exec("std::cout << " + func + "(" + params_str + ");", timeout=60)
 
     @keyword
-    def typeid(self, expression):
+    def call_function_batch(self, func, *rows):
+        """
+        Calls a global C++ function once per argument row and returns the list of outputs.
+
+        All calls are sent to the kernel as a single cell, so a batch costs one round-trip
+        instead of one per call. Each result is stripped like with `Call Function`.
+
+        **Arguments:**
+
+        - ``func``: Name of the function to call.
+        - ``rows``: Argument rows. A row is either a list of arguments or a string holding
+          the whole argument list (e.g. ``2, 3``).
+
+        **Example:**
+
+        | Source Exec | int add(int a, int b) {{ return a + b; }} |
+        | ${res}= | Call Function Batch | add | 1, 2 | 3, 4 |
+        | Should Be Equal | ${res} | ${{['3', '7']}} |
+        """
+        calls = []
+        for row in rows:
+            args = row if isinstance(row, str) else ", ".join(p if type(p) is str else str(p) for p in row)
+            calls.append("std::cout << " + func + "(" + args + ") << '\\x03';")
+        if not calls: return []
+        # Same terminator as `Get Values`: stripping the output cannot shift empty results
+        out = self.source_exec("\n".join(calls), timeout=60)
+        return [v.strip() for v in out.split("\x03")[:len(calls)]]
+
+    @keyword
+    def typeid(self, expression, cache=False):
         """
         Returns the **mangled** C++ type name of an expression (using ``typeid(...).name()``).
 
         **Arguments:**
 
         - ``expression``: The object or type to inspect.
+        - ``cache``: Reuse the result of a previous call with the same expression in the
+          current kernel session. Off by default: the dynamic type of a polymorphic
+          expression (e.g. ``*ptr``) may change between calls, and a cached result would
+          then be stale. Only pass ``True`` for expressions whose type cannot change.
         """
-        return self.source_exec(f'std::cout << typeid({expression}).name();', timeout=60)
+        return self._query_type('typeid', expression, f'_robot_show_type(typeid({expression}), false);', cache)
 
     @keyword
-    def typename(self, expression):
+    def typename(self, expression, cache=False):
         """
         Returns the **demangled** (human-readable) C++ type name of an expression.
 
@@ -628,13 +1508,29 @@ class clang:
         **Arguments:**
 
         - ``expression``: The object or type to inspect.
+        - ``cache``: Reuse the result of a previous call with the same expression in the
+          current kernel session. Off by default: the dynamic type of a polymorphic
+          expression (e.g. ``*ptr``) may change between calls, and a cached result would
+          then be stale. Only pass ``True`` for expressions whose type cannot change.
 
         **Example:**
 
         | ${name}= | Typename | std::string("foo") |
         | Should Contain | ${name} | string |
         """
-        return self.source_exec(f'std::cout << _robot_demangle(typeid({expression}).name());', timeout=60)
+        return self._query_type('typename', expression, f'_robot_show_type(typeid({expression}), true);', cache)
+
+    def _query_type(self, kind, expression, code, cache):
+        key = (kind, expression)
+        if cache and key in self._type_cache:
+            self._type_cache.move_to_end(key)
+            return self._type_cache[key]
+        result = self.source_exec(code, timeout=60)
+        self._type_cache[key] = result
+        self._type_cache.move_to_end(key)
+        if len(self._type_cache) > _TYPE_CACHE_SIZE:
+            self._type_cache.popitem(last=False)
+        return result
 
     @keyword
     def nullptr(self):
@@ -644,3 +1540,41 @@ class clang:
         Helper to represent the null pointer in keyword arguments.
         """
         return "nullptr"
+
+
+def daemon_main(argv=None):
+    """Entry point of ``robotclang-daemon``: keeps a ready kernel for `Start Kernel` to attach to."""
+    import argparse
+    import signal
+    parser = argparse.ArgumentParser(prog='robotclang-daemon', description="Keeps a ready C++ kernel for robotframework-clang suites to attach to.")
+    parser.add_argument('state_file', help="file to publish the kernel in; point CLANG_ROBOT_CONNECTION_FILE at it")
+    parser.add_argument('--kernel', default='xcpp20', help="kernel name, as given to Start Kernel (default: %(default)s)")
+    parser.add_argument('-I', dest='includes', action='append', default=[], help="include path, as given to Add Include Path")
+    parser.add_argument('-L', dest='link_dirs', action='append', default=[], help="link directory, as given to Add Link Directory")
+    parser.add_argument('-l', dest='libs', action='append', default=[], help="library, as given to Link Libraries")
+    args = parser.parse_args(argv)
+
+    lib = clang(pool_size=0)
+    lib.add_include_path(*args.includes)
+    lib.add_link_directory(*args.link_dirs)
+    lib.link_libraries(*args.libs)
+    key = lib._launch_config(args.kernel)
+    km, kc = _spawn_kernel(*key)
+    # Suites attach with channels of their own
+    kc.stop_channels()
+    tmp = f"{args.state_file}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f: json.dump({'connection_file': km.connection_file, 'config': key}, f)
+    os.replace(tmp, args.state_file)
+    print(f"Kernel ready, published in {args.state_file}", flush=True)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.wait(1):
+            if not km.is_alive(): break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try: os.remove(args.state_file)
+        except OSError: pass
+        _shutdown(km, None)
@@ -13,61 +13,114 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import sys
 import os
-import textwrap
-from robot.libdocpkg import LibraryDocumentation
+import hashlib
+from importlib import metadata
 
-def generate_rst(library_path, output_path):
-    # Load library documentation using Robot's Libdoc
+# First line of the generated document: an RST comment recording what it was generated from
+DIGEST_PREFIX = ".. libdoc2rst digest: "
+# Fixed parts of the document
+TITLE = "API Reference\n=============\n\n"
+CONTENTS = ".. contents:: Keywords\n   :local:\n   :depth: 1\n\n"
+
+def robot_version():
+    """Robot Framework version, read from the package metadata to avoid importing Robot."""
+    try:
+        return metadata.version("robotframework")
+    except metadata.PackageNotFoundError:
+        import robot
+        return robot.__version__
+
+def source_digest(library_path):
+    """Digest of everything the output depends on, or None if the library is not a plain file."""
+    if not os.path.isfile(library_path):
+        return None
+    h = hashlib.sha256(robot_version().encode())
+    for path in (library_path, __file__):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def generate_rst(library_path, output_path, force=False):
+    """Writes the RST API reference of a library. Returns False if the output was already up to date."""
+    digest = source_digest(library_path)
+    if digest and not force:
+        try:
+            with open(output_path, 'rb') as f:
+                if f.readline().decode('utf-8', 'replace').strip() == DIGEST_PREFIX + digest:
+                    return False
+        except OSError:
+            pass
+
+    # Load library documentation using Robot's Libdoc. Imported only now: importing Robot
+    # takes longer than everything else an up to date run does
+    from robot.libdocpkg import LibraryDocumentation
     libdoc = LibraryDocumentation(library_path)
     
-    with open(output_path, 'w') as f:
-        # Title
-        f.write("API Reference\n")
-        f.write("=============\n\n")
+    # The document is assembled in memory and written out at once
+    buf = io.StringIO()
+    write = buf.write
+    if digest:
+        write(f"{DIGEST_PREFIX}{digest}\n\n")
+    # Title
+    write(TITLE)
+    
+    # Library Scope/Version info
+    write(f"**Library Scope:** ``{libdoc.scope}``\n\n")
+    if libdoc.version:
+        write(f"**Version:** ``{libdoc.version}``\n\n")
         
-        # Library Scope/Version info
-        f.write(f"**Library Scope:** ``{libdoc.scope}``\n\n")
-        if libdoc.version:
-            f.write(f"**Version:** ``{libdoc.version}``\n\n")
-            
-        f.write(f"{textwrap.dedent(libdoc.doc)}\n\n")
+    # Libdoc reads docstrings through inspect.getdoc: they come already dedented
+    write(f"{libdoc.doc}\n\n")
+    
+    write(CONTENTS)
+    
+    # Keywords
+    for kw in libdoc.keywords:
+        # Read once, used twice each below
+        name, kw_args, doc = kw.name, kw.args, kw.doc
+
+        # Keyword Title as a subsection
+        write(f"{name}\n{'-' * len(name)}\n\n")
         
-        f.write(".. contents:: Keywords\n")
-        f.write("   :local:\n   :depth: 1\n\n")
+        # Arguments
+        if kw_args:
+            # join() builds a list from a generator anyway: hand it one directly
+            args = ", ".join([str(arg) for arg in kw_args])
+            write(f"**Arguments:** ``{args}``\n\n")
         
-        # Keywords
-        for i, kw in enumerate(libdoc.keywords):
-            # Keyword Title as a subsection
-            f.write(f"{kw.name}\n")
-            f.write("-" * len(kw.name) + "\n\n")
-            
-            # Arguments
-            args = ", ".join(str(arg) for arg in kw.args)
-            if args:
-                f.write(f"**Arguments:** ``{args}``\n\n")
-            
-            # Documentation
-            if kw.doc:
-                f.write(f"{textwrap.dedent(kw.doc)}\n\n")
-            
-            # Add explicit spacing but NOT a transition (----) at the end
-            # unless we want a visible separator. 
-            # In Sphinx themes, headers usually suffice.
-            f.write("\n")
+        # Documentation
+        if doc:
+            write(f"{doc}\n\n")
+        
+        # Add explicit spacing but NOT a transition (----) at the end
+        # unless we want a visible separator. 
+        # In Sphinx themes, headers usually suffice.
+        write("\n")
+
+    # Encoded in one pass; binary mode also keeps \n line endings on every platform
+    with open(output_path, 'wb') as out:
+        out.write(buf.getvalue().encode('utf-8'))
+    return True
+
 
 if __name__ == "__main__":
     # Adjust paths relative to project root
     src_path = os.path.abspath("src/clang/clang.py")
     out_path = os.path.abspath("docs/api.rst")
     
-    print(f"Generating RST from {src_path} to {out_path}...")
+    # Status goes to stderr, next to the traceback of a failure, leaving stdout clean
+    print(f"Generating RST from {src_path} to {out_path}...", file=sys.stderr)
     try:
-        generate_rst(src_path, out_path)
-        print("Done.")
+        # --force regenerates even when the library and this script are unchanged
+        if generate_rst(src_path, out_path, force="--force" in sys.argv[1:]):
+            print("Done.", file=sys.stderr)
+        else:
+            print("Up to date.", file=sys.stderr)
     except Exception as e:
-        print(f"Error generating docs: {e}")
+        print(f"Error generating docs: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
         sys.exit(1)